@@ -6,10 +6,13 @@ import os
 import streamlit.components.v1 as components
 import shutil
 import datetime
-import pandas as pd
+import hashlib
+import heapq
 import json
+import selectors
 import signal
-import psutil
+from collections import deque
+from dataclasses import dataclass, asdict
 
 # Install streamlit if not already installed
 try:
@@ -18,9 +21,72 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "streamlit"])
     import streamlit as st
 
-# Persistent storage file
+# Optional: timer-based reruns without blocking the script thread
+try:
+    from streamlit_autorefresh import st_autorefresh
+except ImportError:
+    st_autorefresh = None
+
+# Persistent storage files
 STREAMS_FILE = "streams_data.json"
-ACTIVE_STREAMS_FILE = "active_streams.json"
+PIDS_FILE = "stream_pids.json"
+
+DEFAULT_RTMP_SERVER = "rtmp://a.rtmp.youtube.com/live2/"
+
+@dataclass(slots=True)
+class Stream:
+    """A single scheduled or running stream.
+
+    stream_id is a stable identifier: process handles, progress pipes and
+    log files are keyed by it, so removing a row never orphans another
+    stream the way list positions would.
+    """
+    video: str
+    durasi: str
+    jam_mulai: str
+    streaming_key: str
+    status: str = 'Menunggu'
+    is_shorts: bool = False
+    rtmp_url: str = ''
+    basename: str = ''
+    masked_key: str = ''
+    stream_id: int = -1
+
+    def __post_init__(self):
+        # Precompute per-row derived values once instead of per rerun
+        # (computed here rather than cached_property, which slots rules out)
+        if not self.rtmp_url:
+            self.rtmp_url = DEFAULT_RTMP_SERVER + self.streaming_key
+        if not self.basename:
+            self.basename = os.path.basename(self.video)
+        if not self.masked_key:
+            self.masked_key = (self.streaming_key[:4] + "****"
+                               if len(self.streaming_key) > 4 else "****")
+
+def _stream_from_record(record):
+    """Build a Stream from a saved record (accepts legacy DataFrame keys)"""
+    if 'Video' in record:  # Old pandas column names
+        return Stream(
+            video=record.get('Video', ''),
+            durasi=record.get('Durasi', ''),
+            jam_mulai=record.get('Jam Mulai', ''),
+            streaming_key=record.get('Streaming Key', ''),
+            status=record.get('Status', 'Menunggu'),
+            is_shorts=bool(record.get('Is Shorts', False))
+        )
+    return Stream(**record)
+
+def _next_stream_id(streams):
+    """Smallest id not yet taken by any stream"""
+    return max((s.stream_id for s in streams), default=-1) + 1
+
+def _assign_stream_ids(streams):
+    """Give streams from older save files (without ids) a stable id"""
+    next_id = _next_stream_id(streams)
+    for stream in streams:
+        if stream.stream_id < 0:
+            stream.stream_id = next_id
+            next_id += 1
 
 def load_persistent_streams():
     """Load streams from persistent storage"""
@@ -28,45 +94,187 @@ def load_persistent_streams():
         try:
             with open(STREAMS_FILE, "r") as f:
                 data = json.load(f)
-                return pd.DataFrame(data)
+                streams = [_stream_from_record(record) for record in data]
+                _assign_stream_ids(streams)
+                return streams
         except:
-            return pd.DataFrame(columns=[
-                'Video', 'Durasi', 'Jam Mulai', 'Streaming Key', 'Status', 'Is Shorts'
-            ])
-    return pd.DataFrame(columns=[
-        'Video', 'Durasi', 'Jam Mulai', 'Streaming Key', 'Status', 'Is Shorts'
-    ])
-
-def save_persistent_streams(streams_df):
+            return []
+    return []
+
+def save_persistent_streams(streams):
     """Save streams to persistent storage"""
     try:
         with open(STREAMS_FILE, "w") as f:
-            json.dump(streams_df.to_dict('records'), f, indent=2)
+            json.dump([asdict(s) for s in streams], f, indent=2)
     except Exception as e:
         st.error(f"Error saving streams: {e}")
 
-def load_active_streams():
-    """Load active streams tracking"""
-    if os.path.exists(ACTIVE_STREAMS_FILE):
+def _load_stream_pids():
+    """stream_id -> pid of launched ffmpeg processes, from disk.
+
+    The in-memory proc handles do not survive a Streamlit worker restart,
+    but the detached ffmpeg processes do; this record is what lets the app
+    re-attach to them (or stop them) afterwards.
+    """
+    if os.path.exists(PIDS_FILE):
         try:
-            with open(ACTIVE_STREAMS_FILE, "r") as f:
-                return json.load(f)
+            with open(PIDS_FILE, "r") as f:
+                return {int(k): v for k, v in json.load(f).items()}
         except:
             return {}
     return {}
 
-def save_active_streams(active_streams):
-    """Save active streams tracking"""
+def _save_stream_pids(pids):
+    """Save the stream_id -> pid record to disk"""
     try:
-        with open(ACTIVE_STREAMS_FILE, "w") as f:
-            json.dump(active_streams, f, indent=2)
-    except Exception as e:
-        st.error(f"Error saving active streams: {e}")
+        with open(PIDS_FILE, "w") as f:
+            json.dump(pids, f)
+    except OSError:
+        pass  # Worst case the pid record is stale, not the stream data
+
+def _record_stream_pid(stream_id, pid):
+    """Remember a launched stream's pid across worker restarts"""
+    pids = _load_stream_pids()
+    pids[stream_id] = pid
+    _save_stream_pids(pids)
+
+def _drop_stream_pid(stream_id):
+    """Forget a stream's pid record once the process is gone"""
+    pids = _load_stream_pids()
+    if pids.pop(stream_id, None) is not None:
+        _save_stream_pids(pids)
+
+def _pid_alive(pid):
+    """Whether the pid still names a process we own"""
+    try:
+        os.kill(pid, 0)
+        return True
+    except (ProcessLookupError, PermissionError):
+        # PermissionError: the pid was recycled by someone else's process
+        return False
+
+@st.cache_resource
+def get_stream_procs():
+    """In-memory map of stream_id -> subprocess.Popen for running streams.
+
+    Lives in st.cache_resource so the handles survive page refreshes and
+    are shared across sessions, without any PID/status files on disk.
+    """
+    return {}
+
+@st.cache_resource
+def get_stream_lock():
+    """Lock guarding get_stream_procs() against concurrent reruns/threads"""
+    return threading.Lock()
+
+@st.cache_resource
+def get_progress_fds():
+    """stream_id -> non-blocking read end of the stream's -progress pipe"""
+    return {}
+
+@st.cache_resource
+def get_progress_selector():
+    """Selector covering every stream's progress pipe with one poll"""
+    return selectors.DefaultSelector()
+
+@st.cache_resource
+def get_stream_progress():
+    """stream_id -> latest parsed ffmpeg progress fields (fps, bitrate, ...)"""
+    return {}
+
+def _close_progress_fd(stream_id):
+    """Close and forget a stream's progress pipe, if it has one"""
+    fd = get_progress_fds().pop(stream_id, None)
+    if fd is not None:
+        try:
+            get_progress_selector().unregister(fd)
+        except (KeyError, ValueError):
+            pass
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    get_stream_progress().pop(stream_id, None)
+
+@st.cache_resource
+def start_progress_drainer():
+    """Daemon thread that drains the progress pipes, independent of reruns.
+
+    The write end of each -progress pipe is blocking, so draining must not
+    depend on the UI rerunning: an idle page would let a pipe fill after a
+    few minutes and stall ffmpeg mid-stream. One selector poll per pass
+    still covers every stream.
+    """
+    sel = get_progress_selector()
+    progress = get_stream_progress()
+
+    def _drain():
+        while True:
+            if not sel.get_map():
+                time.sleep(0.5)
+                continue
+
+            for key, _ in sel.select(timeout=1.0):
+                try:
+                    data = os.read(key.fd, 4096)
+                except (BlockingIOError, OSError):
+                    continue
+                if not data:
+                    # EOF: stop watching; the fd itself is closed when the
+                    # process is reaped
+                    try:
+                        sel.unregister(key.fd)
+                    except (KeyError, ValueError):
+                        pass
+                    continue
+
+                fields = progress.setdefault(key.data, {})
+                for line in data.decode(errors='replace').splitlines():
+                    name, sep, value = line.partition('=')
+                    if sep:
+                        fields[name.strip()] = value.strip()
+
+    thread = threading.Thread(target=_drain, daemon=True)
+    thread.start()
+    return thread
+
+# Hardware H.264 encoders, in order of preference
+HW_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_vaapi")
+
+def _encoder_works(name):
+    """Verify an encoder with a one-frame test encode.
+
+    `ffmpeg -encoders` only lists what the build was compiled with, not
+    what the hardware can run, so each candidate has to prove itself.
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-v", "error"]
+    if name == "h264_vaapi":
+        cmd += ["-vaapi_device", "/dev/dri/renderD128"]
+    cmd += ["-f", "lavfi", "-i", "color=black:s=64x64", "-frames:v", "1"]
+    if name == "h264_vaapi":
+        cmd += ["-vf", "format=nv12,hwupload"]
+    cmd += ["-c:v", name, "-f", "null", "-"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=15)
+        return result.returncode == 0
+    except Exception:
+        return False
+
+@st.cache_resource
+def get_available_encoders():
+    """Probe ffmpeg once for working H.264 encoders (hardware first)"""
+    encoders = [name for name in HW_ENCODERS if _encoder_works(name)]
+    encoders.append("libx264")  # Software fallback is always offered
+    return encoders
+
+@st.cache_resource
+def get_ffmpeg_path():
+    """Locate ffmpeg once per process instead of walking PATH per rerun"""
+    return shutil.which('ffmpeg')
 
 def check_ffmpeg():
     """Check if ffmpeg is installed and available"""
-    ffmpeg_path = shutil.which('ffmpeg')
-    if not ffmpeg_path:
+    if not get_ffmpeg_path():
         st.error("FFmpeg is not installed or not in PATH. Please install FFmpeg to use this application.")
         st.markdown("""
         ### How to install FFmpeg:
@@ -78,88 +286,148 @@ def check_ffmpeg():
         return False
     return True
 
-def is_process_running(pid):
-    """Check if a process with given PID is still running"""
-    try:
-        # Check if PID exists and is running
-        if psutil.pid_exists(pid):
-            process = psutil.Process(pid)
-            # Check if it's actually an ffmpeg process
-            if 'ffmpeg' in process.name().lower():
-                return True
-    except (psutil.NoSuchProcess, psutil.AccessDenied):
-        pass
-    return False
-
 def reconnect_to_existing_streams():
     """Reconnect to streams that are still running after page refresh"""
-    active_streams = load_active_streams()
-    
-    # Get all existing PID files
-    pid_files = [f for f in os.listdir('.') if f.startswith('stream_') and f.endswith('.pid')]
-    
-    for pid_file in pid_files:
-        try:
-            row_id = int(pid_file.split('_')[1].split('.')[0])
-            
-            # Check if PID file has valid running process
-            with open(pid_file, "r") as f:
-                pid = int(f.read().strip())
-            
-            if is_process_running(pid):
+    procs = get_stream_procs()
+
+    by_id = {s.stream_id: s for s in st.session_state.streams}
+    with get_stream_lock():
+        for stream_id, process in list(procs.items()):
+            if process.poll() is None:
                 # Process is still running, update status
-                if row_id < len(st.session_state.streams):
-                    st.session_state.streams.loc[row_id, 'Status'] = 'Sedang Live'
-                    active_streams[str(row_id)] = {
-                        'pid': pid,
-                        'started_at': datetime.datetime.now().isoformat()
-                    }
+                stream = by_id.get(stream_id)
+                if stream is not None:
+                    stream.status = 'Sedang Live'
+
+        # After a full worker restart the proc dict is empty while the
+        # detached ffmpeg processes live on; re-attach by recorded pid
+        changed = False
+        for stream_id, pid in _load_stream_pids().items():
+            if stream_id in procs:
+                continue
+            stream = by_id.get(stream_id)
+            if os.name != 'nt' and _pid_alive(pid):
+                if stream is not None and stream.status != 'Sedang Live':
+                    stream.status = 'Sedang Live'
+                    changed = True
             else:
-                # Process is dead, clean up
-                cleanup_stream_files(row_id)
-                if str(row_id) in active_streams:
-                    del active_streams[str(row_id)]
-                
-        except (ValueError, FileNotFoundError, IOError):
-            # Invalid file, remove it
-            try:
-                os.remove(pid_file)
-            except:
-                pass
-    
-    save_active_streams(active_streams)
+                # The process died while no worker was watching
+                if stream is not None and stream.status == 'Sedang Live':
+                    stream.status = 'Terputus'
+                    changed = True
+                _drop_stream_pid(stream_id)
 
-def cleanup_stream_files(row_id):
-    """Clean up all files related to a stream"""
-    files_to_remove = [
-        f"stream_{row_id}.pid",
-        f"stream_{row_id}.status"
-    ]
-    
-    for file_name in files_to_remove:
+    if changed:
+        save_persistent_streams(st.session_state.streams)
+
+@st.cache_resource
+def get_probe_cache():
+    """Cache of (path, mtime, size) -> (video_codec, audio_codec)"""
+    return {}
+
+def probe_codecs(video_path):
+    """Return (video_codec, audio_codec) for a file using ffprobe, cached"""
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return (None, None)
+
+    key = (video_path, stat.st_mtime_ns, stat.st_size)
+    cache = get_probe_cache()
+    if key in cache:
+        return cache[key]
+
+    codecs = []
+    for selector in ("v:0", "a:0"):
         try:
-            if os.path.exists(file_name):
-                os.remove(file_name)
-        except:
-            pass
+            result = subprocess.run(
+                ["ffprobe", "-v", "error", "-select_streams", selector,
+                 "-show_entries", "stream=codec_name", "-of", "csv=p=0", video_path],
+                capture_output=True, text=True
+            )
+            codecs.append(result.stdout.strip() or None)
+        except Exception:
+            codecs.append(None)
 
-def run_ffmpeg(video_path, stream_key, is_shorts, row_id):
-    """Stream a video file to RTMP server using ffmpeg"""
-    output_url = f"rtmp://a.rtmp.youtube.com/live2/{stream_key}"
-    
+    cache[key] = tuple(codecs)
+    return cache[key]
+
+def run_ffmpeg(video_path, output_url, is_shorts, stream_id, encoder="libx264"):
+    """Stream a video file to an RTMP URL using ffmpeg"""
     # Create log file
-    log_file = f"stream_{row_id}.log"
+    log_file = f"stream_{stream_id}.log"
     with open(log_file, "w") as f:
         f.write(f"Starting stream for {video_path} at {datetime.datetime.now()}\n")
-    
+
     # Build command with appropriate settings
     cmd = [
-        "ffmpeg", 
+        "ffmpeg",
         "-re",                  # Read input at native frame rate
-        "-stream_loop", "-1",   # Loop the video indefinitely
-        "-i", video_path,       # Input file
-        "-c:v", "libx264",      # Video codec
-        "-preset", "veryfast",  # Encoding preset
+        "-stream_loop", "-1"    # Loop the video indefinitely
+    ]
+
+    # If the input is already H.264/AAC (and needs no scaling), just remux:
+    # stream copy costs near-zero CPU compared to a full re-encode
+    vcodec, acodec = probe_codecs(video_path)
+    if vcodec == "h264" and acodec == "aac" and not is_shorts:
+        cmd += [
+            "-i", video_path,
+            "-c", "copy",
+            "-bsf:a", "aac_adtstoasc",
+            "-f", "flv",
+            output_url
+        ]
+
+        # Log the command
+        with open(log_file, "a") as f:
+            f.write(f"Running: {' '.join(cmd)}\n")
+
+        return _launch_ffmpeg(cmd, log_file, stream_id)
+
+    if encoder == "h264_nvenc":
+        # Decode, scale and encode on the GPU without round-trips to RAM
+        cmd += ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+    elif encoder == "h264_vaapi":
+        cmd += ["-vaapi_device", "/dev/dri/renderD128"]
+
+    cmd += ["-i", video_path]   # Input file
+
+    if encoder == "h264_nvenc":
+        cmd += ["-c:v", "h264_nvenc", "-preset", "p4", "-tune", "ll"]
+        if is_shorts:
+            cmd += ["-vf", "scale_cuda=720:1280"]
+    elif encoder == "h264_vaapi":
+        # VAAPI frames must be uploaded into GPU memory before encoding
+        vf_chain = "format=nv12,hwupload"
+        if is_shorts:
+            vf_chain = "scale=720:1280," + vf_chain
+        cmd += ["-c:v", "h264_vaapi", "-vf", vf_chain]
+    elif encoder == "h264_qsv":
+        cmd += ["-c:v", "h264_qsv"]
+        if is_shorts:
+            cmd += ["-vf", "scale=720:1280"]
+    else:
+        threads = st.session_state.get('x264_threads', 0)
+        if not threads:
+            # Auto: split the cores across concurrent encodes so N streams
+            # don't each claim every CPU and thrash on context switches
+            with get_stream_lock():
+                n_live = sum(1 for p in get_stream_procs().values() if p.poll() is None)
+            threads = max(1, (os.cpu_count() or 2) // (n_live + 1))
+
+        cmd += [
+            "-c:v", "libx264",
+            "-preset", "veryfast",
+            "-tune", "zerolatency",  # Shrinks x264 lookahead buffers for RTMP
+            "-threads", str(threads),
+            "-x264-params", "sliced-threads=1",  # Less per-frame sync overhead
+            "-fflags", "+nobuffer",
+            "-flags", "low_delay"
+        ]
+        if is_shorts:
+            cmd += ["-vf", "scale=720:1280"]
+
+    cmd += [
         "-b:v", "2500k",        # Video bitrate
         "-maxrate", "2500k",    # Maximum bitrate
         "-bufsize", "5000k",    # Buffer size
@@ -167,270 +435,256 @@ def run_ffmpeg(video_path, stream_key, is_shorts, row_id):
         "-keyint_min", "60",    # Minimum GOP size
         "-c:a", "aac",          # Audio codec
         "-b:a", "128k",         # Audio bitrate
-        "-f", "flv"             # Output format
+        "-f", "flv",            # Output format
+        output_url
     ]
     
-    # Add scale filter for shorts if needed
-    if is_shorts:
-        cmd += ["-vf", "scale=720:1280"]
-    
-    # Add output URL
-    cmd.append(output_url)
-    
     # Log the command
     with open(log_file, "a") as f:
         f.write(f"Running: {' '.join(cmd)}\n")
-    
-    try:
-        # Start the process with CREATE_NEW_PROCESS_GROUP on Windows
+
+    return _launch_ffmpeg(cmd, log_file, stream_id)
+
+def _launch_ffmpeg(cmd, log_file, stream_id):
+    """Launch an ffmpeg command and track its handle; does not block"""
+    # ffmpeg writes its output straight into the log file; the only pipe is
+    # the -progress channel, which the background drainer thread empties
+    with open(log_file, "a") as log_fp:
         if os.name == 'nt':  # Windows
             process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT, 
-                text=True,
-                bufsize=1,
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=log_fp,
+                stderr=subprocess.STDOUT,
                 creationflags=subprocess.CREATE_NEW_PROCESS_GROUP
             )
+            progress_rfd = None
         else:  # Unix/Linux/Mac
+            # Per-stream progress channel: ffmpeg reports key=value lines
+            # into a pipe we hold instead of any on-disk status protocol
+            progress_rfd, progress_wfd = os.pipe()
+            os.set_blocking(progress_rfd, False)
             process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT, 
-                text=True,
-                bufsize=1,
-                preexec_fn=os.setsid  # Create new session
+                cmd + ["-progress", f"pipe:{progress_wfd}"],
+                stdin=subprocess.DEVNULL,
+                stdout=log_fp,
+                stderr=subprocess.STDOUT,
+                pass_fds=[progress_wfd],
+                start_new_session=True  # Survives a Streamlit worker restart
             )
-        
-        # Store process ID for later reference
-        with open(f"stream_{row_id}.pid", "w") as f:
-            f.write(str(process.pid))
-        
-        # Update status
-        with open(f"stream_{row_id}.status", "w") as f:
-            f.write("streaming")
-        
-        # Update active streams tracking
-        active_streams = load_active_streams()
-        active_streams[str(row_id)] = {
-            'pid': process.pid,
-            'started_at': datetime.datetime.now().isoformat()
-        }
-        save_active_streams(active_streams)
-        
-        # Read and log output in a separate thread to avoid blocking
-        def log_output():
-            try:
-                for line in process.stdout:
-                    with open(log_file, "a") as f:
-                        f.write(line)
-            except:
-                pass
-        
-        log_thread = threading.Thread(target=log_output, daemon=True)
-        log_thread.start()
-        
-        # Wait for process to complete
-        process.wait()
-        
-        # Update status when done
-        with open(f"stream_{row_id}.status", "w") as f:
-            f.write("completed")
-        
-        with open(log_file, "a") as f:
-            f.write("Streaming completed.\n")
-        
-        # Remove from active streams
-        active_streams = load_active_streams()
-        if str(row_id) in active_streams:
-            del active_streams[str(row_id)]
-        save_active_streams(active_streams)
-        
-    except Exception as e:
-        error_msg = f"Error: {str(e)}"
-        
-        # Write error to log file
-        with open(log_file, "a") as f:
-            f.write(f"{error_msg}\n")
-        
-        # Write error to status file
-        with open(f"stream_{row_id}.status", "w") as f:
-            f.write(f"error: {str(e)}")
-        
-        # Remove from active streams
-        active_streams = load_active_streams()
-        if str(row_id) in active_streams:
-            del active_streams[str(row_id)]
-        save_active_streams(active_streams)
-    
-    finally:
-        with open(log_file, "a") as f:
-            f.write("Streaming finished or stopped.\n")
-        
-        # Clean up PID file
-        cleanup_stream_files(row_id)
+            os.close(progress_wfd)  # Child keeps its own copy
 
-def start_stream(video_path, stream_key, is_shorts, row_id):
-    """Start a stream in a separate process (not thread)"""
+    # Keep the process handle in memory for status checks and stopping
+    with get_stream_lock():
+        get_stream_procs()[stream_id] = process
+        if progress_rfd is not None:
+            get_progress_fds()[stream_id] = progress_rfd
+            get_progress_selector().register(progress_rfd, selectors.EVENT_READ, data=stream_id)
+
+    # Also record the pid on disk so a restarted worker can still find it
+    _record_stream_pid(stream_id, process.pid)
+
+    return process
+
+def start_stream(stream, encoder="libx264"):
+    """Launch the ffmpeg process for a stream.
+
+    The process runs detached; no wrapper thread sits blocked on wait().
+    Completion is picked up by check_stream_statuses polling the handle.
+    """
     try:
-        # Update status immediately
-        st.session_state.streams.loc[row_id, 'Status'] = 'Sedang Live'
+        run_ffmpeg(stream.video, stream.rtmp_url, stream.is_shorts,
+                   stream.stream_id, encoder)
+
+        # Update status now that the process is actually launched
+        stream.status = 'Sedang Live'
         save_persistent_streams(st.session_state.streams)
-        
-        # Write initial status file
-        with open(f"stream_{row_id}.status", "w") as f:
-            f.write("starting")
-        
-        # Start streaming in a separate thread (but make it non-daemon)
-        thread = threading.Thread(
-            target=run_ffmpeg,
-            args=(video_path, stream_key, is_shorts, row_id),
-            daemon=False  # Changed to False so it survives page refresh
-        )
-        thread.start()
-        
+
         return True
     except Exception as e:
         st.error(f"Error starting stream: {e}")
         return False
 
-def stop_stream(row_id):
+def stop_stream(stream):
     """Stop a running stream"""
     try:
-        active_streams = load_active_streams()
-        
-        # First try to get PID from tracking
-        pid = None
-        if str(row_id) in active_streams:
-            pid = active_streams[str(row_id)]['pid']
-        
-        # If not in tracking, try PID file
-        if not pid and os.path.exists(f"stream_{row_id}.pid"):
-            with open(f"stream_{row_id}.pid", "r") as f:
-                pid = int(f.read().strip())
-        
-        if pid and is_process_running(pid):
-            # Try to terminate the process gracefully
+        with get_stream_lock():
+            process = get_stream_procs().pop(stream.stream_id, None)
+            _close_progress_fd(stream.stream_id)
+
+        if process and process.poll() is None:
+            # SIGINT is ffmpeg's graceful quit: it flushes the FLV trailer
+            # and closes the RTMP session cleanly instead of dropping it
             try:
-                if os.name == 'nt':  # Windows
-                    # Use taskkill for Windows
-                    subprocess.run(['taskkill', '/F', '/PID', str(pid)], 
-                                 capture_output=True, check=False)
-                else:  # Unix/Linux/Mac
-                    # Send SIGTERM first, then SIGKILL if needed
-                    try:
-                        os.killpg(os.getpgid(pid), signal.SIGTERM)
-                        time.sleep(2)  # Give it time to shut down gracefully
-                        if is_process_running(pid):
-                            os.killpg(os.getpgid(pid), signal.SIGKILL)
-                    except ProcessLookupError:
-                        pass  # Process already terminated
-                
-                # Update status
-                st.session_state.streams.loc[row_id, 'Status'] = 'Dihentikan'
-                save_persistent_streams(st.session_state.streams)
-                
-                # Update status file
-                with open(f"stream_{row_id}.status", "w") as f:
-                    f.write("stopped")
-                
-                # Remove from active streams
-                if str(row_id) in active_streams:
-                    del active_streams[str(row_id)]
-                save_active_streams(active_streams)
-                
-                # Clean up files
-                cleanup_stream_files(row_id)
-                
-                return True
-                
-            except Exception as e:
-                st.error(f"Error stopping stream: {str(e)}")
-                return False
-        else:
-            # Process not found, just update status
-            st.session_state.streams.loc[row_id, 'Status'] = 'Dihentikan'
-            save_persistent_streams(st.session_state.streams)
-            cleanup_stream_files(row_id)
-            
-            # Remove from active streams
-            if str(row_id) in active_streams:
-                del active_streams[str(row_id)]
-            save_active_streams(active_streams)
-            
-            return True
-            
+                if os.name == 'nt':  # Windows has no SIGINT for children
+                    process.terminate()
+                else:
+                    process.send_signal(signal.SIGINT)
+                try:
+                    process.wait(timeout=3)  # Give it time to shut down gracefully
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+            except ProcessLookupError:
+                pass  # Process already terminated
+        elif process is None and os.name != 'nt':
+            # No in-memory handle (the worker restarted): stop the detached
+            # process by its recorded pid instead of silently succeeding
+            pid = _load_stream_pids().get(stream.stream_id)
+            if pid is not None and _pid_alive(pid):
+                try:
+                    os.kill(pid, signal.SIGINT)
+                    deadline = time.monotonic() + 3
+                    while _pid_alive(pid) and time.monotonic() < deadline:
+                        time.sleep(0.1)
+                    if _pid_alive(pid):
+                        os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass  # Process already terminated
+
+        _drop_stream_pid(stream.stream_id)
+
+        # Update status
+        stream.status = 'Dihentikan'
+        save_persistent_streams(st.session_state.streams)
+
+        return True
+
     except Exception as e:
         st.error(f"Error stopping stream: {str(e)}")
         return False
 
 def check_stream_statuses():
-    """Check status files for all streams and update accordingly"""
-    active_streams = load_active_streams()
-    
-    for idx, row in st.session_state.streams.iterrows():
-        status_file = f"stream_{idx}.status"
-        
-        # Check if stream is supposed to be active
-        if str(idx) in active_streams:
-            pid = active_streams[str(idx)]['pid']
-            
-            # Check if process is still running
-            if not is_process_running(pid):
-                # Process died, update status
-                if row['Status'] == 'Sedang Live':
-                    # Check for completion status
-                    if os.path.exists(status_file):
-                        with open(status_file, "r") as f:
-                            status = f.read().strip()
-                        
-                        if status == "completed":
-                            st.session_state.streams.loc[idx, 'Status'] = 'Selesai'
-                        elif status.startswith("error:"):
-                            st.session_state.streams.loc[idx, 'Status'] = status
-                        else:
-                            st.session_state.streams.loc[idx, 'Status'] = 'Terputus'
-                        
-                        save_persistent_streams(st.session_state.streams)
-                        os.remove(status_file)
-                    
-                    # Remove from active streams
-                    del active_streams[str(idx)]
-                    save_active_streams(active_streams)
-                    cleanup_stream_files(idx)
-        
-        # Regular status file checking
-        elif os.path.exists(status_file):
-            with open(status_file, "r") as f:
-                status = f.read().strip()
-            
-            if status == "completed" and row['Status'] == 'Sedang Live':
-                st.session_state.streams.loc[idx, 'Status'] = 'Selesai'
-                save_persistent_streams(st.session_state.streams)
-                os.remove(status_file)
-            
-            elif status.startswith("error:") and row['Status'] == 'Sedang Live':
-                st.session_state.streams.loc[idx, 'Status'] = status
+    """Poll the in-memory process handles and update stream statuses"""
+    procs = get_stream_procs()
+    by_id = {s.stream_id: s for s in st.session_state.streams}
+
+    with get_stream_lock():
+        for stream_id, process in list(procs.items()):
+            returncode = process.poll()
+            if returncode is None:
+                continue  # Still running
+
+            # Process exited, update status
+            stream = by_id.get(stream_id)
+            if stream is not None and stream.status == 'Sedang Live':
+                if returncode == 0:
+                    stream.status = 'Selesai'
+                else:
+                    stream.status = f'error: exit {returncode}'
                 save_persistent_streams(st.session_state.streams)
-                os.remove(status_file)
+
+                with open(f"stream_{stream_id}.log", "a") as f:
+                    f.write(f"Streaming finished with exit code {returncode}.\n")
+
+            del procs[stream_id]
+            _close_progress_fd(stream_id)
+            _drop_stream_pid(stream_id)
+
+def _schedule_epoch(jam_mulai):
+    """Epoch timestamp of today at HH:MM"""
+    t = datetime.datetime.strptime(jam_mulai, "%H:%M").time()
+    return datetime.datetime.combine(datetime.date.today(), t).timestamp()
+
+def rebuild_schedule_heap():
+    """Rebuild the (start_epoch, stream_id) min-heap from waiting rows"""
+    heap = [
+        (_schedule_epoch(stream.jam_mulai), stream.stream_id)
+        for stream in st.session_state.streams
+        if stream.status == 'Menunggu'
+    ]
+    heapq.heapify(heap)
+    st.session_state.schedule_heap = heap
 
 def check_scheduled_streams():
-    """Check for streams that need to be started based on schedule"""
-    current_time = datetime.datetime.now().strftime("%H:%M")
-    
-    for idx, row in st.session_state.streams.iterrows():
-        if row['Status'] == 'Menunggu' and row['Jam Mulai'] == current_time:
-            # Start the stream
-            start_stream(row['Video'], row['Streaming Key'], row.get('Is Shorts', False), idx)
-
-def get_stream_logs(row_id, max_lines=100):
-    """Get logs for a specific stream"""
-    log_file = f"stream_{row_id}.log"
-    if os.path.exists(log_file):
-        with open(log_file, "r") as f:
-            lines = f.readlines()
-        return lines[-max_lines:] if len(lines) > max_lines else lines
-    return []
+    """Start streams whose scheduled time has arrived.
+
+    Only the heap top is compared against the clock, so this is O(1) when
+    nothing is due, and a stream whose minute was missed still fires.
+    Removing a stream purges its heap entries, so a reused id can never
+    pick up the removed stream's start time.
+    """
+    heap = st.session_state.get('schedule_heap', [])
+    now = time.time()
+
+    while heap and heap[0][0] <= now:
+        _, stream_id = heapq.heappop(heap)
+        stream = next((s for s in st.session_state.streams
+                       if s.stream_id == stream_id), None)
+        if stream is not None and stream.status == 'Menunggu':
+            start_stream(stream, st.session_state.get('encoder', 'libx264'))
+
+VIDEO_EXTS = frozenset({'mp4', 'flv', 'avi', 'mov', 'mkv'})
+
+@st.cache_data(ttl=5)
+def list_videos(cwd='.'):
+    """List video files using one directory scan, cached for a few seconds"""
+    with os.scandir(cwd) as it:
+        return [
+            e.name for e in it
+            if e.is_file() and e.name.rpartition('.')[2].lower() in VIDEO_EXTS
+        ]
+
+# Terminal statuses whose rows can be removed from the table
+REMOVABLE_STATUSES = frozenset({'Selesai', 'Dihentikan', 'Terputus'})
+
+STATUS_ICONS = {
+    'Sedang Live': '🟢',
+    'Menunggu': '🟡',
+    'Selesai': '🔵',
+    'Dihentikan': '🟠',
+    'Terputus': '🔴'
+}
+
+def _status_icon(status):
+    """Icon for a status string used in the streams table"""
+    if status.startswith('error:'):
+        return '🔴'
+    return STATUS_ICONS.get(status, '⚪')
+
+@st.cache_resource
+def get_log_cache():
+    """log_file -> ((mtime_ns, size), tail lines) of the last read"""
+    return {}
+
+def get_stream_logs(stream_id, max_lines=100):
+    """Get logs for a specific stream, re-reading only when the file changed"""
+    log_file = f"stream_{stream_id}.log"
+    try:
+        stat = os.stat(log_file)
+    except OSError:
+        return []
+
+    # The auto-refreshing Logs tab calls this every couple of seconds;
+    # skip the read entirely while ffmpeg has not written anything new
+    cache = get_log_cache()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = cache.get(log_file)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    with open(log_file, "r") as f:
+        # deque(maxlen=...) keeps only the tail while reading; no full
+        # list materialization followed by a slice copy
+        lines = list(deque(f, maxlen=max_lines))
+    cache[log_file] = (key, lines)
+    return lines
+
+@st.fragment
+def render_ads():
+    """Ad iframe in its own fragment: page reruns (e.g. the log refresh
+    timer) no longer re-execute the external ad script in the browser"""
+    components.html(
+        """
+        <div style="background:#f0f2f6;padding:20px;border-radius:10px;text-align:center">
+            <script type='text/javascript'
+                    src='//pl26562103.profitableratecpm.com/28/f9/95/28f9954a1d5bbf4924abe123c76a68d2.js'>
+            </script>
+            <p style="color:#888">Iklan akan muncul di sini</p>
+        </div>
+        """,
+        height=300
+    )
 
 def main():
     # Page configuration must be the first Streamlit command
@@ -449,40 +703,67 @@ def main():
     # Initialize session state with persistent data
     if 'streams' not in st.session_state:
         st.session_state.streams = load_persistent_streams()
+        rebuild_schedule_heap()
     
     # Reconnect to existing streams after page refresh
     reconnect_to_existing_streams()
+
+    # Keep the progress pipes drained even while the page is idle
+    start_progress_drainer()
     
     # Bagian iklan
     show_ads = st.sidebar.checkbox("Tampilkan Iklan", value=False)
     if show_ads:
         st.sidebar.subheader("Iklan Sponsor")
-        components.html(
-            """
-            <div style="background:#f0f2f6;padding:20px;border-radius:10px;text-align:center">
-                <script type='text/javascript' 
-                        src='//pl26562103.profitableratecpm.com/28/f9/95/28f9954a1d5bbf4924abe123c76a68d2.js'>
-                </script>
-                <p style="color:#888">Iklan akan muncul di sini</p>
-            </div>
-            """,
-            height=300
-        )
-    
-    # Check status of running streams
-    check_stream_statuses()
-    
-    # Check for scheduled streams
-    check_scheduled_streams()
+        render_ads()
     
+    # Encoder selection (hardware encoders probed once and cached)
+    with st.sidebar.expander("Pengaturan Encoder"):
+        encoders = get_available_encoders()
+        # libx264 stays the default; verified hardware encoders are opt-in
+        st.selectbox("Video encoder", encoders,
+                     index=encoders.index("libx264"), key='encoder')
+        if encoders[0] != "libx264":
+            st.caption(f"Hardware encoder terdeteksi: {encoders[0]}")
+
+    # RTMP server selection; per-row URLs are cached and only rewritten
+    # when the server actually changes
+    with st.sidebar.expander("Pengaturan RTMP"):
+        st.text_input("RTMP Server", value=DEFAULT_RTMP_SERVER, key='rtmp_server')
+        st.number_input("Thread per stream (libx264, 0 = otomatis)", min_value=0,
+                        max_value=16, value=0, key='x264_threads')
+
+    rtmp_server = st.session_state.rtmp_server
+    if st.session_state.get('_rtmp_server_applied') != rtmp_server:
+        for stream in st.session_state.streams:
+            if stream.status != 'Sedang Live':
+                stream.rtmp_url = rtmp_server + stream.streaming_key
+        st.session_state['_rtmp_server_applied'] = rtmp_server
+
+    # Wake the page up once per second so status, schedule and progress
+    # stay current with nobody interacting; without the component the
+    # checks still run on every user-triggered rerun
+    if st_autorefresh is not None:
+        st_autorefresh(interval=1000, key="status_tick")
+
+    # Check running and scheduled streams at most once per second; reruns
+    # triggered by widget interaction (every keystroke) skip the polling
+    last_check = st.session_state.setdefault('_last_check', 0.0)
+    now = time.monotonic()
+    if now - last_check >= 1.0:
+        check_stream_statuses()
+        check_scheduled_streams()
+        st.session_state['_last_check'] = now
+
     # Auto-refresh every 10 seconds to check stream status
     if st.sidebar.button("🔄 Refresh Status"):
         st.rerun()
     
     # Show persistent stream info
-    active_streams = load_active_streams()
-    if active_streams:
-        st.sidebar.success(f"🟢 {len(active_streams)} stream(s) berjalan")
+    with get_stream_lock():
+        n_active = sum(1 for p in get_stream_procs().values() if p.poll() is None)
+    if n_active:
+        st.sidebar.success(f"🟢 {n_active} stream(s) berjalan")
     else:
         st.sidebar.info("⚫ Tidak ada stream aktif")
     
@@ -495,62 +776,66 @@ def main():
         # Auto refresh indicator
         st.caption("Status akan diperbarui otomatis. Streaming akan tetap berjalan meski halaman di-refresh.")
         
-        # Display the streams table with action buttons
-        if not st.session_state.streams.empty:
-            # Create a header row
-            header_cols = st.columns([2, 1, 1, 2, 2, 2])
-            header_cols[0].write("**Video**")
-            header_cols[1].write("**Duration**")
-            header_cols[2].write("**Start Time**")
-            header_cols[3].write("**Streaming Key**")
-            header_cols[4].write("**Status**")
-            header_cols[5].write("**Action**")
-            
-            # Display each stream
-            for i, row in st.session_state.streams.iterrows():
-                cols = st.columns([2, 1, 1, 2, 2, 2])
-                cols[0].write(os.path.basename(row['Video']))  # Just show filename
-                cols[1].write(row['Durasi'])
-                cols[2].write(row['Jam Mulai'])
-                # Mask streaming key for security
-                masked_key = row['Streaming Key'][:4] + "****" if len(row['Streaming Key']) > 4 else "****"
-                cols[3].write(masked_key)
-                
-                # Status with color coding
-                status = row['Status']
-                if status == 'Sedang Live':
-                    cols[4].markdown(f"🟢 **{status}**")
-                elif status == 'Menunggu':
-                    cols[4].markdown(f"🟡 **{status}**")
-                elif status == 'Selesai':
-                    cols[4].markdown(f"🔵 **{status}**")
-                elif status == 'Dihentikan':
-                    cols[4].markdown(f"🟠 **{status}**")
-                elif status.startswith('error:'):
-                    cols[4].markdown(f"🔴 **Error**")
-                else:
-                    cols[4].write(status)
-                
-                # Action buttons
-                if row['Status'] == 'Menunggu':
-                    if cols[5].button("▶️ Start", key=f"start_{i}"):
-                        if start_stream(row['Video'], row['Streaming Key'], row.get('Is Shorts', False), i):
-                            st.rerun()
-                
-                elif row['Status'] == 'Sedang Live':
-                    if cols[5].button("⏹️ Stop", key=f"stop_{i}"):
-                        if stop_stream(i):
-                            st.rerun()
-                
-                elif row['Status'] in ['Selesai', 'Dihentikan', 'Terputus'] or row['Status'].startswith('error:'):
-                    if cols[5].button("🗑️ Remove", key=f"remove_{i}"):
-                        st.session_state.streams = st.session_state.streams.drop(i).reset_index(drop=True)
-                        save_persistent_streams(st.session_state.streams)
-                        # Also remove log file if it exists
-                        log_file = f"stream_{i}.log"
-                        if os.path.exists(log_file):
-                            os.remove(log_file)
-                        st.rerun()
+        # Display the streams in a single table widget instead of a
+        # 6-column grid per row (one component registration, not N x 6)
+        streams = st.session_state.streams
+        if streams:
+            st.dataframe(
+                {
+                    'Video': [s.basename for s in streams],
+                    'Duration': [s.durasi for s in streams],
+                    'Start Time': [s.jam_mulai for s in streams],
+                    'Streaming Key': [s.masked_key for s in streams],
+                    'Status': [f"{_status_icon(s.status)} {s.status}" for s in streams]
+                },
+                use_container_width=True
+            )
+
+            # One action bar driven by row selection instead of buttons per row
+            selected = st.selectbox(
+                "Pilih stream",
+                options=list(range(len(streams))),
+                format_func=lambda i: f"{streams[i].basename} (ID: {streams[i].stream_id})"
+            )
+            stream = streams[selected]
+
+            action_cols = st.columns(3)
+            if action_cols[0].button("▶️ Start", disabled=stream.status != 'Menunggu'):
+                if start_stream(stream, st.session_state.get('encoder', 'libx264')):
+                    st.rerun()
+
+            if action_cols[1].button("⏹️ Stop", disabled=stream.status != 'Sedang Live'):
+                if stop_stream(stream):
+                    st.rerun()
+
+            # Live encoder stats from the progress pipe
+            if stream.status == 'Sedang Live':
+                fields = get_stream_progress().get(stream.stream_id)
+                if fields:
+                    st.caption(
+                        f"fps: {fields.get('fps', '-')} | "
+                        f"bitrate: {fields.get('bitrate', '-')} | "
+                        f"waktu: {fields.get('out_time', '-')}"
+                    )
+
+            removable = (stream.status in REMOVABLE_STATUSES
+                         or stream.status.startswith('error:'))
+            if action_cols[2].button("🗑️ Remove", disabled=not removable):
+                # Stable ids: removing a row cannot orphan another row's
+                # process handle, progress pipe or log file
+                streams.pop(selected)
+                save_persistent_streams(streams)
+                # Purge the row's schedule entries: its id may be handed to
+                # a future stream, which must not inherit this start time
+                heap = [entry for entry in st.session_state.get('schedule_heap', [])
+                        if entry[1] != stream.stream_id]
+                heapq.heapify(heap)
+                st.session_state.schedule_heap = heap
+                # Also remove log file if it exists
+                log_file = f"stream_{stream.stream_id}.log"
+                if os.path.exists(log_file):
+                    os.remove(log_file)
+                st.rerun()
         else:
             st.info("No streams added yet. Use the 'Add New Stream' tab to add a stream.")
     
@@ -558,7 +843,7 @@ def main():
         st.subheader("Add New Stream")
         
         # List available video files
-        video_files = [f for f in os.listdir('.') if f.endswith(('.mp4', '.flv', '.avi', '.mov', '.mkv'))]
+        video_files = list_videos()
         
         col1, col2 = st.columns(2)
         
@@ -569,11 +854,22 @@ def main():
             uploaded_file = st.file_uploader("Atau upload video baru", type=['mp4', 'flv', 'avi', 'mov', 'mkv'])
             
             if uploaded_file:
-                # Save the uploaded file
-                with open(uploaded_file.name, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                # Save in 1 MiB chunks, hashing as we go: re-uploads of the
+                # same content are detected and reuse the file already on disk
+                ext = os.path.splitext(uploaded_file.name)[1]
+                tmp_path = uploaded_file.name + ".part"
+                hasher = hashlib.blake2b(digest_size=8)
+                with open(tmp_path, "wb") as f:
+                    while chunk := uploaded_file.read(1024 * 1024):
+                        hasher.update(chunk)
+                        f.write(chunk)
+
+                video_path = f"upload_{hasher.hexdigest()}{ext}"
+                if os.path.exists(video_path):
+                    os.remove(tmp_path)  # Same content already uploaded before
+                else:
+                    os.rename(tmp_path, video_path)
                 st.success("Video berhasil diupload!")
-                video_path = uploaded_file.name
             elif selected_video:
                 video_path = selected_video
             else:
@@ -596,16 +892,20 @@ def main():
                 # Get just the filename from the path
                 video_filename = os.path.basename(video_path)
                 
-                new_stream = pd.DataFrame({
-                    'Video': [video_path],
-                    'Durasi': [duration],
-                    'Jam Mulai': [start_time_str],
-                    'Streaming Key': [stream_key],
-                    'Status': ['Menunggu'],
-                    'Is Shorts': [is_shorts]
-                })
-                
-                st.session_state.streams = pd.concat([st.session_state.streams, new_stream], ignore_index=True)
+                new_id = _next_stream_id(st.session_state.streams)
+                st.session_state.streams.append(Stream(
+                    video=video_path,
+                    durasi=duration,
+                    jam_mulai=start_time_str,
+                    streaming_key=stream_key,
+                    is_shorts=is_shorts,
+                    rtmp_url=st.session_state.get('rtmp_server', DEFAULT_RTMP_SERVER) + stream_key,
+                    stream_id=new_id
+                ))
+                heapq.heappush(
+                    st.session_state.setdefault('schedule_heap', []),
+                    (_schedule_epoch(start_time_str), new_id)
+                )
                 save_persistent_streams(st.session_state.streams)
                 st.success(f"Added stream for {video_filename}")
                 st.rerun()
@@ -624,27 +924,30 @@ def main():
         
         if stream_ids:
             # Create options for selectbox
+            by_id = {s.stream_id: s for s in st.session_state.streams}
             stream_options = {}
-            for idx in stream_ids:
-                if idx in st.session_state.streams.index:
-                    video_name = os.path.basename(st.session_state.streams.loc[idx, 'Video'])
-                    stream_options[f"{video_name} (ID: {idx})"] = idx
+            for sid in stream_ids:
+                if sid in by_id:
+                    stream_options[f"{by_id[sid].basename} (ID: {sid})"] = sid
             
             if stream_options:
                 selected_stream = st.selectbox("Select stream to view logs", options=list(stream_options.keys()))
                 selected_id = stream_options[selected_stream]
                 
-                # Display logs
-                logs = get_stream_logs(selected_id)
-                log_container = st.container()
-                with log_container:
-                    st.code("".join(logs))
-                
+                # Display logs into a placeholder so refreshes only
+                # repaint this element
+                log_placeholder = st.empty()
+                log_placeholder.code("".join(get_stream_logs(selected_id)))
+
                 # Auto-refresh option
                 auto_refresh = st.checkbox("Auto-refresh logs", value=False)
                 if auto_refresh:
-                    time.sleep(3)  # Wait 3 seconds
-                    st.rerun()
+                    if st_autorefresh is not None:
+                        # Timer-driven rerun; nothing blocks in time.sleep
+                        st_autorefresh(interval=2000, key=f"logs_{selected_id}")
+                    else:
+                        time.sleep(2)  # Fallback when the component is missing
+                        st.rerun()
             else:
                 st.info("No logs available. Start a stream to see logs.")
         else:
@@ -680,9 +983,6 @@ def main():
         - Multiple streams can run simultaneously, but this requires significant CPU and bandwidth
         - **NEW**: Streams now persist across page refreshes and app restarts!
         """)
-    
-    # Auto refresh every 30 seconds
-    time.sleep(1)  # Small delay to prevent too frequent refreshing
 
 if __name__ == '__main__':
     main()
@@ -1,12 +1,17 @@
 import sys
+import asyncio
+import collections
+import concurrent.futures
+import functools
 import subprocess
 import threading
 import time
 import os
+import signal
 import streamlit.components.v1 as components
 import shutil
 import datetime
-import pandas as pd
+from dataclasses import dataclass
 
 # Install streamlit if not already installed
 try:
@@ -15,10 +20,20 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "streamlit"])
     import streamlit as st
 
+# Optional: refresh on a timer without blocking the script thread
+try:
+    from streamlit_autorefresh import st_autorefresh
+except ImportError:
+    st_autorefresh = None
+
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_path():
+    """Locate ffmpeg once per process instead of walking PATH per rerun"""
+    return shutil.which('ffmpeg')
+
 def check_ffmpeg():
     """Check if ffmpeg is installed and available"""
-    ffmpeg_path = shutil.which('ffmpeg')
-    if not ffmpeg_path:
+    if not _ffmpeg_path():
         st.error("FFmpeg is not installed or not in PATH. Please install FFmpeg to use this application.")
         st.markdown("""
         ### How to install FFmpeg:
@@ -30,190 +45,387 @@ def check_ffmpeg():
         return False
     return True
 
-def run_ffmpeg(video_path, stream_key, is_shorts, row_id):
-    """Stream a video file to RTMP server using ffmpeg"""
+# Terminal statuses whose rows can be removed from the table
+REMOVABLE_STATUSES = frozenset({'Selesai', 'Dihentikan'})
+
+@dataclass(slots=True)
+class Stream:
+    """A single scheduled or running stream"""
+    video: str
+    durasi: str
+    jam_mulai: str
+    streaming_key: str
+    status: str = 'Menunggu'
+    is_shorts: bool = False
+    basename: str = ''
+    masked_key: str = ''
+
+    def __post_init__(self):
+        # Precompute per-row derived values once instead of per rerun
+        # (computed here rather than cached_property, which slots rules out)
+        if not self.basename:
+            self.basename = os.path.basename(self.video)
+        if not self.masked_key:
+            self.masked_key = (self.streaming_key[:4] + "****"
+                               if len(self.streaming_key) > 4 else "****")
+
+@st.cache_resource
+def get_stream_state():
+    """In-memory per-stream state (pid, status, handle), shared across reruns"""
+    return {}
+
+@st.cache_resource
+def get_state_lock():
+    """Lock guarding get_stream_state() against concurrent threads"""
+    return threading.Lock()
+
+@st.cache_resource
+def get_event_loop():
+    """One background event loop driving every stream's ffmpeg process.
+
+    All streams share this single thread instead of each pinning an OS
+    thread that blocks reading ffmpeg's output.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def _encoder_works(name):
+    """Verify an encoder with a one-frame test encode.
+
+    `ffmpeg -encoders` only lists what the build was compiled with, not
+    what the hardware can run, so each candidate has to prove itself.
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-v", "error"]
+    if name == "h264_vaapi":
+        cmd += ["-vaapi_device", "/dev/dri/renderD128"]
+    cmd += ["-f", "lavfi", "-i", "color=black:s=64x64", "-frames:v", "1"]
+    if name == "h264_vaapi":
+        cmd += ["-vf", "format=nv12,hwupload"]
+    cmd += ["-c:v", name, "-f", "null", "-"]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=15)
+        return result.returncode == 0
+    except Exception:
+        return False
+
+@st.cache_resource
+def get_hw_encoder():
+    """Best working hardware H.264 encoder, probed once (None if none)"""
+    for name in ("h264_nvenc", "h264_qsv", "h264_vaapi"):
+        if _encoder_works(name):
+            return name
+    return None
+
+@st.cache_resource
+def get_probe_cache():
+    """video_path -> codec name of the first video stream"""
+    return {}
+
+def probe_video_codec(video_path):
+    """Return the input's video codec via ffprobe, cached per path"""
+    cache = get_probe_cache()
+    if video_path in cache:
+        return cache[video_path]
+
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=codec_name", "-of", "csv=p=0", video_path],
+            capture_output=True, text=True
+        )
+        codec = result.stdout.strip() or None
+    except Exception:
+        codec = None
+
+    cache[video_path] = codec
+    return codec
+
+# Recognised video extensions for the picker
+VIDEO_EXTS = frozenset({'mp4', 'flv', 'avi', 'mov', 'mkv'})
+
+@st.cache_data(ttl=5)
+def list_videos(cwd='.'):
+    """Video files in cwd via one scandir pass, cached for a few seconds"""
+    return [entry.name for entry in os.scandir(cwd)
+            if entry.is_file()
+            and entry.name.rpartition('.')[2].lower() in VIDEO_EXTS]
+
+async def run_ffmpeg(video_path, stream_key, is_shorts, row_id, video_codec, hw_encoder):
+    """Stream a video file to RTMP server using ffmpeg.
+
+    video_codec and hw_encoder are resolved by the caller on the script
+    thread: their blocking ffprobe/test-encode subprocess calls must not
+    run on the shared event loop, where they would stall every other
+    stream's launch and supervision.
+    """
     output_url = f"rtmp://a.rtmp.youtube.com/live2/{stream_key}"
-    
+
     # Create log file
     log_file = f"stream_{row_id}.log"
     with open(log_file, "w") as f:
         f.write(f"Starting stream for {video_path} at {datetime.datetime.now()}\n")
     
-    # Build command with appropriate settings
-    cmd = [
-        "ffmpeg", 
-        "-re",                  # Read input at native frame rate
-        "-stream_loop", "-1",   # Loop the video indefinitely
-        "-i", video_path,       # Input file
-        "-c:v", "libx264",      # Video codec
-        "-preset", "veryfast",  # Encoding preset
-        "-b:v", "2500k",        # Video bitrate
-        "-maxrate", "2500k",    # Maximum bitrate
-        "-bufsize", "5000k",    # Buffer size
-        "-g", "60",             # GOP size
-        "-keyint_min", "60",    # Minimum GOP size
-        "-c:a", "aac",          # Audio codec
-        "-b:a", "128k",         # Audio bitrate
-        "-f", "flv"             # Output format
-    ]
-    
-    # Add scale filter for shorts if needed
-    if is_shorts:
-        cmd += ["-vf", "scale=720:1280"]
-    
-    # Add output URL
-    cmd.append(output_url)
+    # Pre-encoded H.264 input needs no re-encode (unless it must be scaled
+    # for shorts): stream copy just remuxes at near-zero CPU
+    if not is_shorts and video_codec == "h264":
+        cmd = [
+            "ffmpeg",
+            "-re",                  # Read input at native frame rate
+            "-stream_loop", "-1",   # Loop the video indefinitely
+            "-i", video_path,       # Input file
+            "-c", "copy",           # Copy both streams, no transcode
+            "-f", "flv",            # Output format
+            output_url
+        ]
+    else:
+        # Prefer a hardware encoder when the box has one; the libx264
+        # fallback splits the cores across concurrent encodes instead of
+        # letting each ffmpeg default to -threads 0 (= every CPU)
+        pre_input_args = []
+        scale_filter = "scale=720:1280" if is_shorts else None
+        if hw_encoder == "h264_nvenc":
+            video_args = ["-c:v", "h264_nvenc", "-preset", "p4", "-tune", "ll", "-rc", "cbr"]
+        elif hw_encoder == "h264_vaapi":
+            # VAAPI needs an explicit device plus an upload into GPU memory
+            pre_input_args = ["-vaapi_device", "/dev/dri/renderD128"]
+            vf_chain = "format=nv12,hwupload"
+            if scale_filter:
+                vf_chain = scale_filter + "," + vf_chain
+            scale_filter = None  # folded into the upload chain
+            video_args = ["-c:v", "h264_vaapi", "-vf", vf_chain]
+        elif hw_encoder:
+            video_args = ["-c:v", hw_encoder]
+        else:
+            with get_state_lock():
+                n_live = sum(1 for s in get_stream_state().values()
+                             if s.get('status') == 'streaming')
+            threads = max(1, (os.cpu_count() or 2) // (n_live + 1))
+            video_args = [
+                "-c:v", "libx264",      # Video codec
+                "-preset", "veryfast",  # Encoding preset
+                "-threads", str(threads),
+                "-x264-params", "sliced-threads=1"
+            ]
+
+        # Build command with appropriate settings
+        cmd = [
+            "ffmpeg",
+            "-re",                  # Read input at native frame rate
+            "-stream_loop", "-1"    # Loop the video indefinitely
+        ] + pre_input_args + [
+            "-i", video_path        # Input file
+        ] + video_args + [
+            "-b:v", "2500k",        # Video bitrate
+            "-maxrate", "2500k",    # Maximum bitrate
+            "-bufsize", "5000k",    # Buffer size
+            "-g", "60",             # GOP size
+            "-keyint_min", "60",    # Minimum GOP size
+            "-c:a", "aac",          # Audio codec
+            "-b:a", "128k",         # Audio bitrate
+            "-f", "flv"             # Output format
+        ]
+
+        # Add scale filter for shorts if needed
+        if scale_filter:
+            cmd += ["-vf", scale_filter]
+
+        # Add output URL
+        cmd.append(output_url)
     
     # Log the command
     with open(log_file, "a") as f:
         f.write(f"Running: {' '.join(cmd)}\n")
     
+    # One long-lived, line-buffered log handle instead of an
+    # open/write/close cycle for every line ffmpeg prints
+    log_fp = open(log_file, "a", buffering=1)
+
     try:
-        # Start the process
-        process = subprocess.Popen(
-            cmd, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.STDOUT, 
-            text=True,
-            bufsize=1  # Line buffered
+        # Start the process on the shared loop; ffmpeg writes straight into
+        # the log file, so there is no stdout pipe to read (ffmpeg's stats
+        # lines end in \r, which asyncio's line reader cannot split)
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=log_fp,
+            stderr=asyncio.subprocess.STDOUT
         )
-        
-        # Store process ID for later reference
-        with open(f"stream_{row_id}.pid", "w") as f:
-            f.write(str(process.pid))
-        
-        # Update status
-        with open(f"stream_{row_id}.status", "w") as f:
-            f.write("streaming")
-        
-        # Read and log output
-        for line in process.stdout:
-            with open(log_file, "a") as f:
-                f.write(line)
-        
+
+        # Track the process in memory instead of pid/status files
+        with get_state_lock():
+            get_stream_state()[row_id] = {
+                'pid': process.pid,
+                'proc': process,
+                'status': 'streaming'
+            }
+
         # Wait for process to complete
-        process.wait()
-        
-        # Update status when done
-        with open(f"stream_{row_id}.status", "w") as f:
-            f.write("completed")
-        
-        with open(log_file, "a") as f:
-            f.write("Streaming completed.\n")
-        
+        returncode = await process.wait()
+
+        # Update status when done; a nonzero exit (bad key, missing
+        # hardware, network drop) is an error, not a finished stream.
+        # Skip the update if stop_stream() already recorded a stop.
+        with get_state_lock():
+            state = get_stream_state().setdefault(row_id, {})
+            if state.get('status') == 'streaming':
+                if returncode == 0:
+                    state['status'] = 'completed'
+                else:
+                    state['status'] = f"error: exit {returncode}"
+
+        log_fp.write(f"Streaming finished with exit code {returncode}.\n")
+
     except Exception as e:
         error_msg = f"Error: {str(e)}"
-        
+
         # Write error to log file
-        with open(log_file, "a") as f:
-            f.write(f"{error_msg}\n")
-        
-        # Write error to status file
-        with open(f"stream_{row_id}.status", "w") as f:
-            f.write(f"error: {str(e)}")
-    
+        log_fp.write(f"{error_msg}\n")
+
+        # Record the error without discarding the tracked process handle
+        with get_state_lock():
+            state = get_stream_state().setdefault(row_id, {})
+            state['status'] = f"error: {str(e)}"
+
     finally:
-        with open(log_file, "a") as f:
-            f.write("Streaming finished or stopped.\n")
-        
-        # Clean up PID file
-        if os.path.exists(f"stream_{row_id}.pid"):
-            os.remove(f"stream_{row_id}.pid")
+        log_fp.write("Streaming finished or stopped.\n")
+        log_fp.close()
 
 def start_stream(video_path, stream_key, is_shorts, row_id):
-    """Start a stream in a separate thread"""
-    # Create a thread for streaming
-    thread = threading.Thread(
-        target=run_ffmpeg,
-        args=(video_path, stream_key, is_shorts, row_id),
-        daemon=True
+    """Schedule a stream on the shared event loop"""
+    # Resolve the codec and encoder here, on the script thread; both run
+    # blocking subprocesses that must stay off the event loop
+    video_codec = probe_video_codec(video_path)
+    hw_encoder = get_hw_encoder()
+
+    # Record 'starting' before scheduling: written afterwards it could
+    # clobber the coroutine's record and lose the process handle
+    with get_state_lock():
+        get_stream_state()[row_id] = {'status': 'starting'}
+
+    asyncio.run_coroutine_threadsafe(
+        run_ffmpeg(video_path, stream_key, is_shorts, row_id,
+                   video_codec, hw_encoder),
+        get_event_loop()
     )
-    thread.start()
-    
+
     # Update status immediately
-    st.session_state.streams.loc[row_id, 'Status'] = 'Sedang Live'
-    
-    # Write initial status file
-    with open(f"stream_{row_id}.status", "w") as f:
-        f.write("starting")
-    
+    st.session_state.streams[row_id].status = 'Sedang Live'
+
     return True
 
 def stop_stream(row_id):
-    """Stop a running stream"""
-    # Check if PID file exists
-    if os.path.exists(f"stream_{row_id}.pid"):
-        try:
-            # Read the PID
-            with open(f"stream_{row_id}.pid", "r") as f:
-                pid = int(f.read().strip())
-            
-            # Try to terminate the process
-            if os.name == 'nt':  # Windows
-                os.system(f"taskkill /F /PID {pid}")
-            else:  # Unix/Linux/Mac
-                import signal
+    """Stop a running stream via its own process handle"""
+    with get_state_lock():
+        state = get_stream_state().get(row_id, {})
+        process = state.get('proc')
+        pid = state.get('pid')
+
+    if process is None:
+        # The handle was lost (e.g. the worker restarted); fall back to
+        # the recorded pid instead of silently marking the row stopped
+        # while ffmpeg keeps broadcasting
+        if pid is not None:
+            try:
                 os.kill(pid, signal.SIGTERM)
-            
-            # Update status
-            st.session_state.streams.loc[row_id, 'Status'] = 'Dihentikan'
-            
-            # Update status file
-            with open(f"stream_{row_id}.status", "w") as f:
-                f.write("stopped")
-            
-            # Clean up PID file
-            os.remove(f"stream_{row_id}.pid")
-            
-            return True
+            except (ProcessLookupError, PermissionError):
+                pass  # Process already gone (or the pid was recycled)
+        else:
+            st.warning("Tidak ada handle proses untuk stream ini; "
+                       "stream mungkin masih berjalan di luar aplikasi.")
+    elif process.returncode is None:
+        try:
+            # Terminate only this stream's ffmpeg; never pkill them all
+            process.terminate()
+            future = asyncio.run_coroutine_threadsafe(process.wait(), get_event_loop())
+            try:
+                # Future.result raises concurrent.futures.TimeoutError;
+                # the builtin TimeoutError only matches on Python >= 3.11
+                future.result(timeout=5)
+            except concurrent.futures.TimeoutError:
+                process.kill()
+                # Reap the killed child so it does not linger as a zombie
+                asyncio.run_coroutine_threadsafe(
+                    process.wait(), get_event_loop()
+                ).result(timeout=5)
         except Exception as e:
             st.error(f"Error stopping stream: {str(e)}")
             return False
-    else:
-        # No PID file, try to kill all ffmpeg processes (fallback)
-        if os.name == 'nt':  # Windows
-            os.system("taskkill /F /IM ffmpeg.exe")
-        else:  # Unix/Linux/Mac
-            os.system("pkill ffmpeg")
-        
-        # Update status
-        st.session_state.streams.loc[row_id, 'Status'] = 'Dihentikan'
-        return True
+
+    # Update status
+    st.session_state.streams[row_id].status = 'Dihentikan'
+
+    with get_state_lock():
+        get_stream_state()[row_id] = {'status': 'stopped'}
+
+    return True
 
 def check_stream_statuses():
-    """Check status files for all streams"""
-    for idx, row in st.session_state.streams.iterrows():
-        status_file = f"stream_{idx}.status"
-        
-        if os.path.exists(status_file):
-            with open(status_file, "r") as f:
-                status = f.read().strip()
-            
-            if status == "completed" and row['Status'] == 'Sedang Live':
-                st.session_state.streams.loc[idx, 'Status'] = 'Selesai'
-                os.remove(status_file)
-            
-            elif status.startswith("error:") and row['Status'] == 'Sedang Live':
-                st.session_state.streams.loc[idx, 'Status'] = status
-                os.remove(status_file)
+    """Check the in-memory stream state for all streams"""
+    with get_state_lock():
+        states = {idx: s.get('status') for idx, s in get_stream_state().items()}
+
+    for idx, stream in enumerate(st.session_state.streams):
+        status = states.get(idx)
+        if not status:
+            continue
+
+        if status == "completed" and stream.status == 'Sedang Live':
+            stream.status = 'Selesai'
+
+        elif status.startswith("error:") and stream.status == 'Sedang Live':
+            stream.status = status
 
 def check_scheduled_streams():
     """Check for streams that need to be started based on schedule"""
     current_time = datetime.datetime.now().strftime("%H:%M")
     
-    for idx, row in st.session_state.streams.iterrows():
-        if row['Status'] == 'Menunggu' and row['Jam Mulai'] == current_time:
+    for idx, stream in enumerate(st.session_state.streams):
+        if stream.status == 'Menunggu' and stream.jam_mulai == current_time:
             # Start the stream
-            start_stream(row['Video'], row['Streaming Key'], row.get('Is Shorts', False), idx)
+            start_stream(stream.video, stream.streaming_key, stream.is_shorts, idx)
+
+@st.cache_resource
+def get_log_cache():
+    """log_file -> ((mtime_ns, size), tail lines) of the last read"""
+    return {}
 
 def get_stream_logs(row_id, max_lines=100):
-    """Get logs for a specific stream"""
+    """Get logs for a specific stream, re-reading only when the file changed"""
     log_file = f"stream_{row_id}.log"
-    if os.path.exists(log_file):
-        with open(log_file, "r") as f:
-            lines = f.readlines()
-        return lines[-max_lines:] if len(lines) > max_lines else lines
-    return []
+    try:
+        stat = os.stat(log_file)
+    except OSError:
+        return []
+
+    # The auto-refreshing Logs tab calls this every couple of seconds;
+    # skip the read entirely while ffmpeg has not written anything new
+    cache = get_log_cache()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = cache.get(log_file)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    with open(log_file, "r") as f:
+        # Keep only the tail while reading instead of slicing a full list
+        lines = list(collections.deque(f, maxlen=max_lines))
+    cache[log_file] = (key, lines)
+    return lines
+
+@st.fragment
+def render_ads():
+    """Ad iframe in its own fragment so full-page reruns skip it"""
+    components.html(
+        """
+        <div style="background:#f0f2f6;padding:20px;border-radius:10px;text-align:center">
+            <script type='text/javascript'
+                    src='//pl26562103.profitableratecpm.com/28/f9/95/28f9954a1d5bbf4924abe123c76a68d2.js'>
+            </script>
+            <p style="color:#888">Iklan akan muncul di sini</p>
+        </div>
+        """,
+        height=300
+    )
 
 def main():
     # Page configuration must be the first Streamlit command
@@ -233,23 +445,12 @@ def main():
     show_ads = st.sidebar.checkbox("Tampilkan Iklan", value=False)
     if show_ads:
         st.sidebar.subheader("Iklan Sponsor")
-        components.html(
-            """
-            <div style="background:#f0f2f6;padding:20px;border-radius:10px;text-align:center">
-                <script type='text/javascript' 
-                        src='//pl26562103.profitableratecpm.com/28/f9/95/28f9954a1d5bbf4924abe123c76a68d2.js'>
-                </script>
-                <p style="color:#888">Iklan akan muncul di sini</p>
-            </div>
-            """,
-            height=300
-        )
+        render_ads()
     
-    # Initialize session state
+    # Initialize session state; a plain list of Stream rows needs no
+    # pandas import at all
     if 'streams' not in st.session_state:
-        st.session_state.streams = pd.DataFrame(columns=[
-            'Video', 'Durasi', 'Jam Mulai', 'Streaming Key', 'Status', 'Is Shorts'
-        ])
+        st.session_state.streams = []
     
     # Check status of running streams
     check_stream_statuses()
@@ -263,47 +464,47 @@ def main():
     with tab1:
         st.subheader("Manage Streams")
         
-        # Display the streams table with action buttons
-        if not st.session_state.streams.empty:
-            # Create a header row
-            header_cols = st.columns([2, 1, 1, 2, 2, 2])
-            header_cols[0].write("**Video**")
-            header_cols[1].write("**Duration**")
-            header_cols[2].write("**Start Time**")
-            header_cols[3].write("**Streaming Key**")
-            header_cols[4].write("**Status**")
-            header_cols[5].write("**Action**")
-            
-            # Display each stream
-            for i, row in st.session_state.streams.iterrows():
-                cols = st.columns([2, 1, 1, 2, 2, 2])
-                cols[0].write(os.path.basename(row['Video']))  # Just show filename
-                cols[1].write(row['Durasi'])
-                cols[2].write(row['Jam Mulai'])
-                # Mask streaming key for security
-                masked_key = row['Streaming Key'][:4] + "****" if len(row['Streaming Key']) > 4 else "****"
-                cols[3].write(masked_key)
-                cols[4].write(row['Status'])
-                
-                # Action buttons
-                if row['Status'] == 'Menunggu':
-                    if cols[5].button("Start", key=f"start_{i}"):
-                        if start_stream(row['Video'], row['Streaming Key'], row.get('Is Shorts', False), i):
-                            st.rerun()
-                
-                elif row['Status'] == 'Sedang Live':
-                    if cols[5].button("Stop", key=f"stop_{i}"):
-                        if stop_stream(i):
-                            st.rerun()
-                
-                elif row['Status'] in ['Selesai', 'Dihentikan'] or row['Status'].startswith('error:'):
-                    if cols[5].button("Remove", key=f"remove_{i}"):
-                        st.session_state.streams = st.session_state.streams.drop(i).reset_index(drop=True)
-                        # Also remove log file if it exists
-                        log_file = f"stream_{i}.log"
-                        if os.path.exists(log_file):
-                            os.remove(log_file)
-                        st.rerun()
+        # One table widget instead of a six-column grid per row
+        streams = st.session_state.streams
+        if streams:
+            st.dataframe(
+                {
+                    'Video': [s.basename for s in streams],
+                    'Duration': [s.durasi for s in streams],
+                    'Start Time': [s.jam_mulai for s in streams],
+                    'Streaming Key': [s.masked_key for s in streams],
+                    'Status': [s.status for s in streams]
+                },
+                use_container_width=True
+            )
+
+            # One action bar driven by row selection instead of buttons per row
+            selected = st.selectbox(
+                "Pilih stream",
+                options=list(range(len(streams))),
+                format_func=lambda i: f"{streams[i].basename} (ID: {i})"
+            )
+            stream = streams[selected]
+            status = stream.status
+
+            action_cols = st.columns(3)
+            if action_cols[0].button("Start", disabled=status != 'Menunggu'):
+                if start_stream(stream.video, stream.streaming_key,
+                                stream.is_shorts, selected):
+                    st.rerun()
+
+            if action_cols[1].button("Stop", disabled=status != 'Sedang Live'):
+                if stop_stream(selected):
+                    st.rerun()
+
+            removable = status in REMOVABLE_STATUSES or status.startswith('error:')
+            if action_cols[2].button("Remove", disabled=not removable):
+                streams.pop(selected)
+                # Also remove log file if it exists
+                log_file = f"stream_{selected}.log"
+                if os.path.exists(log_file):
+                    os.remove(log_file)
+                st.rerun()
         else:
             st.info("No streams added yet. Use the 'Add New Stream' tab to add a stream.")
     
@@ -311,7 +512,7 @@ def main():
         st.subheader("Add New Stream")
         
         # List available video files
-        video_files = [f for f in os.listdir('.') if f.endswith(('.mp4', '.flv', '.avi', '.mov', '.mkv'))]
+        video_files = list_videos()
         
         col1, col2 = st.columns(2)
         
@@ -322,9 +523,10 @@ def main():
             uploaded_file = st.file_uploader("Atau upload video baru", type=['mp4', 'flv', 'avi', 'mov', 'mkv'])
             
             if uploaded_file:
-                # Save the uploaded file
+                # Save the uploaded file in 4 MB chunks; getbuffer() would
+                # materialize the whole video in RAM first
                 with open(uploaded_file.name, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                    shutil.copyfileobj(uploaded_file, f, length=4 * 1024 * 1024)
                 st.success("Video berhasil diupload!")
                 video_path = uploaded_file.name
             elif selected_video:
@@ -349,16 +551,13 @@ def main():
                 # Get just the filename from the path
                 video_filename = os.path.basename(video_path)
                 
-                new_stream = pd.DataFrame({
-                    'Video': [video_path],
-                    'Durasi': [duration],
-                    'Jam Mulai': [start_time_str],
-                    'Streaming Key': [stream_key],
-                    'Status': ['Menunggu'],
-                    'Is Shorts': [is_shorts]
-                })
-                
-                st.session_state.streams = pd.concat([st.session_state.streams, new_stream], ignore_index=True)
+                st.session_state.streams.append(Stream(
+                    video=video_path,
+                    durasi=duration,
+                    jam_mulai=start_time_str,
+                    streaming_key=stream_key,
+                    is_shorts=is_shorts
+                ))
                 st.success(f"Added stream for {video_filename}")
                 st.rerun()
             else:
@@ -378,8 +577,8 @@ def main():
             # Create options for selectbox
             stream_options = {}
             for idx in stream_ids:
-                if idx in st.session_state.streams.index:
-                    video_name = os.path.basename(st.session_state.streams.loc[idx, 'Video'])
+                if idx < len(st.session_state.streams):
+                    video_name = st.session_state.streams[idx].basename
                     stream_options[f"{video_name} (ID: {idx})"] = idx
             
             if stream_options:
@@ -392,11 +591,16 @@ def main():
                 with log_container:
                     st.code("".join(logs))
                 
-                # Auto-refresh option
+                # Auto-refresh option: rerun on a timer instead of
+                # sleeping in the script thread, which blocked every
+                # widget for the duration
                 auto_refresh = st.checkbox("Auto-refresh logs", value=True)
                 if auto_refresh:
-                    time.sleep(2)  # Wait 2 seconds
-                    st.rerun()
+                    if st_autorefresh is not None:
+                        st_autorefresh(interval=2000, key=f"logs_{selected_id}")
+                    else:
+                        time.sleep(2)  # Fallback without the component
+                        st.rerun()
             else:
                 st.info("No logs available. Start a stream to see logs.")
         else: